@@ -11,30 +11,90 @@ from __future__ import annotations
 import html
 import logging
 import re
-import xml.etree.ElementTree as ET
-from typing import Any
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Final
+from xml.sax.saxutils import escape
+
+try:
+    # libxml2 bindings: ~5× faster parse/serialize of the TCM Steps blobs,
+    # which run once per existing test case on every sync.
+    from lxml import etree as ET
+
+    _XML_ERRORS: tuple[type[Exception], ...] = (ET.XMLSyntaxError, ValueError)
+except ImportError:  # stdlib fallback
+    import xml.etree.ElementTree as ET
+
+    _XML_ERRORS = (ET.ParseError, ValueError)
 
 import requests
 from azure.devops.connection import Connection
 from msrest.authentication import BasicAuthentication
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import Settings
 from models import ExistingTestCase, GeneratedTestCase, TestStep, UserStory
 
 logger = logging.getLogger("test-sync-pro")
 
+# Cap on concurrent writes so a large sync stays inside ADO's rate limits.
+MAX_CONCURRENT_WRITES: Final = 16
+
+# get_work_items accepts at most 200 ids per call.
+WIT_BATCH_SIZE: Final = 200
+
+# Suite layout is effectively immutable for a run; re-fetch after this.
+FOLDER_CACHE_TTL: Final = 600.0  # seconds
+
+# Only the fields each model actually consumes — avoids the payload
+# bloat of expand="All" (relations + rendered HTML for every item).
+STORY_FIELDS: Final = [
+    "System.Title",
+    "System.Description",
+    "Microsoft.VSTS.Common.AcceptanceCriteria",
+    "Microsoft.VSTS.Common.Priority",
+    "System.Tags",
+    "System.State",
+]
+TC_FIELDS: Final = [
+    "System.Title",
+    "Microsoft.VSTS.TCM.Steps",
+    "Microsoft.VSTS.Common.Priority",
+    "System.Tags",
+    "System.WorkItemType",
+]
+
 # ── XML helpers for the TCM Steps field ─────────────────────────────────
 
 def _steps_xml(steps: list[TestStep]) -> str:
-    """Build the XML blob that ADO stores in Microsoft.VSTS.TCM.Steps."""
-    root = ET.Element("steps", id="0", last=str(len(steps) + 1))
+    """Build the XML blob that ADO stores in Microsoft.VSTS.TCM.Steps.
+
+    The schema is trivial (fixed attributes, text content only), so the
+    blob is assembled directly from escaped strings — several times
+    faster than building and serializing an element tree per test case.
+    """
+    parts = [f'<steps id="0" last="{len(steps) + 1}">']
     for idx, step in enumerate(steps, start=2):
-        el = ET.SubElement(root, "step", id=str(idx), type="ValidateStep")
-        action = ET.SubElement(el, "parameterizedString", isformatted="true")
-        action.text = step.action
-        expected = ET.SubElement(el, "parameterizedString", isformatted="true")
-        expected.text = step.expected_result
-    return ET.tostring(root, encoding="unicode")
+        parts.append(
+            f'<step id="{idx}" type="ValidateStep">'
+            f'<parameterizedString isformatted="true">'
+            f"{escape(step.action or '')}</parameterizedString>"
+            f'<parameterizedString isformatted="true">'
+            f"{escape(step.expected_result or '')}</parameterizedString>"
+            f"</step>"
+        )
+    parts.append("</steps>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _steps_xml_cached(steps: tuple[TestStep, ...]) -> str:
+    """Memoized _steps_xml — generated cases often share the fallback
+    boilerplate steps, so identical step tuples serialize once."""
+    return _steps_xml(list(steps))
 
 
 def _parse_steps_xml(xml_str: str | None) -> list[TestStep]:
@@ -51,15 +111,24 @@ def _parse_steps_xml(xml_str: str | None) -> list[TestStep]:
             action_text = _strip_html(action_text)
             expected_text = _strip_html(expected_text)
             steps.append(TestStep(action=action_text, expected_result=expected_text))
-    except ET.ParseError:
+    except _XML_ERRORS:
         logger.warning("Could not parse TCM Steps XML; treating as empty.")
     return steps
 
 
+_TAG_RE: Final = re.compile(r"<[^>]+>")
+
+
 def _strip_html(text: str) -> str:
     """Remove HTML tags and decode entities."""
-    clean = re.sub(r"<[^>]+>", "", text)
-    return html.unescape(clean).strip()
+    return html.unescape(_TAG_RE.sub("", text)).strip()
+
+
+def _parse_tags(raw: str | None) -> list[str]:
+    """Split a System.Tags field ('a; b; c') into a clean list."""
+    if not raw:
+        return []
+    return [t for t in map(str.strip, raw.split(";")) if t]
 
 
 # ── Main client ─────────────────────────────────────────────────────────
@@ -81,21 +150,51 @@ class ADOClient:
         self._project = Settings.ADO_PROJECT
         self._plan_id = Settings.ADO_TEST_PLAN_ID
 
-        # REST session for endpoints the SDK does not cover
+        # REST session for endpoints the SDK does not cover.
+        # Every request targets the same dev.azure.com host, so mount an
+        # enlarged keep-alive pool with retry/backoff: sockets are reused
+        # across calls and 429/503 storms are throttled instead of raising.
         self._session = requests.Session()
         self._session.auth = ("", Settings.ADO_PAT)
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST", "PATCH"]),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=32, pool_maxsize=64, max_retries=retry
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(
+            {
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Connection": "keep-alive",
+            }
+        )
         self._base = f"{Settings.ADO_ORG_URL}/{Settings.ADO_PROJECT}"
         self._org_base = Settings.ADO_ORG_URL
         self._api = "api-version=7.1-preview"
         self._json_header = {"Content-Type": "application/json"}
         self._patch_header = {"Content-Type": "application/json-patch+json"}
 
+        # Memoized suite lookups (root id never changes for a plan;
+        # the folder map is refreshed after FOLDER_CACHE_TTL).
+        self._root_suite_id: int | None = None
+        self._folder_map_cache: dict[str, int] | None = None
+        self._folder_map_fetched_at: float = 0.0
+        self._suite_index: dict[int, dict[str, int]] | None = None
+
     # ── User Story ──────────────────────────────────────────────────────
 
-    def get_user_story(self, story_id: int) -> UserStory:
-        """Fetch a single User Story work item by ID."""
-        wi = self._wit.get_work_item(story_id, expand="All")
-        fields: dict[str, Any] = wi.fields
+    @staticmethod
+    def _story_from_fields(
+        story_id: int, fields: dict[str, Any]
+    ) -> UserStory:
+        """Build a UserStory model from a work item's field dict."""
         return UserStory(
             id=story_id,
             title=fields.get("System.Title", ""),
@@ -104,60 +203,77 @@ class ADOClient:
                 fields.get("Microsoft.VSTS.Common.AcceptanceCriteria", "") or ""
             ),
             priority=int(fields.get("Microsoft.VSTS.Common.Priority", 2)),
-            tags=[
-                t.strip()
-                for t in fields.get("System.Tags", "").split(";")
-                if t.strip()
-            ],
+            tags=_parse_tags(fields.get("System.Tags")),
             state=fields.get("System.State", ""),
         )
 
-    # ── Linked Test Cases ───────────────────────────────────────────────
-
-    def get_linked_test_cases(self, story_id: int) -> list[ExistingTestCase]:
-        """Return every Test Case linked to *story_id* via hierarchy."""
-        wi = self._wit.get_work_item(story_id, expand="Relations")
-        if not wi.relations:
-            return []
-
+    @staticmethod
+    def _harvest_tc_ids(relations: list[Any] | None) -> list[int]:
+        """Extract linked work-item ids from Hierarchy-Forward relations."""
         tc_ids: list[int] = []
-        for rel in wi.relations:
+        for rel in relations or []:
             if "Hierarchy-Forward" in (rel.rel or ""):
                 url: str = rel.url
                 try:
                     tc_ids.append(int(url.rsplit("/", 1)[-1]))
                 except ValueError:
                     continue
+        return tc_ids
+
+    def get_user_story(self, story_id: int) -> UserStory:
+        """Fetch a single User Story work item by ID."""
+        wi = self._wit.get_work_item(story_id, fields=STORY_FIELDS)
+        return self._story_from_fields(story_id, wi.fields)
+
+    def get_story_and_tests(
+        self, story_id: int
+    ) -> tuple[UserStory, list[ExistingTestCase]]:
+        """Fetch a story and its linked Test Cases in one relations pass.
+
+        expand="Relations" returns the story's fields *and* its links in
+        a single round trip, so this saves the separate get_user_story
+        call the two-step flow pays.
+        """
+        wi = self._wit.get_work_item(story_id, expand="Relations")
+        story = self._story_from_fields(story_id, wi.fields)
+        return story, self._fetch_test_cases(self._harvest_tc_ids(wi.relations))
+
+    # ── Linked Test Cases ───────────────────────────────────────────────
+
+    def get_linked_test_cases(self, story_id: int) -> list[ExistingTestCase]:
+        """Return every Test Case linked to *story_id* via hierarchy."""
+        wi = self._wit.get_work_item(story_id, expand="Relations")
+        return self._fetch_test_cases(self._harvest_tc_ids(wi.relations))
 
+    def _fetch_test_cases(self, tc_ids: list[int]) -> list[ExistingTestCase]:
+        """Batch-fetch Test Case work items by id, chunked per API limit."""
         if not tc_ids:
             return []
 
         results: list[ExistingTestCase] = []
-        work_items = self._wit.get_work_items(
-            ids=tc_ids, expand="All", error_policy="Omit"
-        )
-        for item in work_items:
-            if item is None:
-                continue
-            f = item.fields
-            if f.get("System.WorkItemType") != "Test Case":
-                continue
-            results.append(
-                ExistingTestCase(
-                    id=item.id,
-                    title=f.get("System.Title", ""),
-                    steps=_parse_steps_xml(
-                        f.get("Microsoft.VSTS.TCM.Steps")
-                    ),
-                    priority=int(f.get("Microsoft.VSTS.Common.Priority", 2)),
-                    tags=[
-                        t.strip()
-                        for t in f.get("System.Tags", "").split(";")
-                        if t.strip()
-                    ],
-                    revision=item.rev or 1,
-                )
+        for i in range(0, len(tc_ids), WIT_BATCH_SIZE):
+            chunk = tc_ids[i : i + WIT_BATCH_SIZE]
+            work_items = self._wit.get_work_items(
+                ids=chunk, fields=TC_FIELDS, error_policy="Omit"
             )
+            for item in work_items or []:
+                if item is None:
+                    continue
+                f = item.fields
+                if f.get("System.WorkItemType") != "Test Case":
+                    continue
+                results.append(
+                    ExistingTestCase(
+                        id=item.id,
+                        title=f.get("System.Title", ""),
+                        steps=_parse_steps_xml(
+                            f.get("Microsoft.VSTS.TCM.Steps")
+                        ),
+                        priority=int(f.get("Microsoft.VSTS.Common.Priority", 2)),
+                        tags=_parse_tags(f.get("System.Tags")),
+                        revision=item.rev or 1,
+                    )
+                )
         return results
 
     # ── Create / Update Test Case Work Items ────────────────────────────
@@ -186,7 +302,7 @@ class ADOClient:
             {
                 "op": "add",
                 "path": "/fields/Microsoft.VSTS.TCM.Steps",
-                "value": _steps_xml(steps),
+                "value": _steps_xml_cached(tuple(steps)),
             },
             {
                 "op": "add",
@@ -246,7 +362,7 @@ class ADOClient:
             {
                 "op": "replace",
                 "path": "/fields/Microsoft.VSTS.TCM.Steps",
-                "value": _steps_xml(steps),
+                "value": _steps_xml_cached(tuple(steps)),
             },
             {
                 "op": "replace",
@@ -267,32 +383,105 @@ class ADOClient:
         resp.raise_for_status()
         logger.info("Updated Test Case #%s  →  '%s'", tc_id, tc.title)
 
+    def create_test_cases(
+        self, cases: list[GeneratedTestCase], story_id: int
+    ) -> list[tuple[GeneratedTestCase, int]]:
+        """Create many Test Cases concurrently.
+
+        The pooled session is thread-safe, so the per-case PATCH round
+        trips overlap instead of paying one RTT each in sequence.
+        Returns (case, new id) pairs for the creates that succeeded, in
+        submission order; a failed create is logged and skipped rather
+        than aborting the rest of the batch.
+        """
+        if not cases:
+            return []
+        workers = min(MAX_CONCURRENT_WRITES, len(cases))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.create_test_case, tc, story_id)
+                for tc in cases
+            ]
+            created: list[tuple[GeneratedTestCase, int]] = []
+            for tc, future in zip(cases, futures):
+                try:
+                    created.append((tc, future.result()))
+                except Exception as exc:
+                    logger.error(
+                        "Failed to create Test Case '%s': %s", tc.title, exc
+                    )
+        if len(created) < len(cases):
+            logger.warning(
+                "Created %d of %d test cases.", len(created), len(cases)
+            )
+        return created
+
+    def update_test_cases(
+        self, pairs: list[tuple[int, GeneratedTestCase]]
+    ) -> list[tuple[int, GeneratedTestCase]]:
+        """Update many existing Test Cases concurrently.
+
+        Returns the pairs that updated successfully, in submission
+        order; failures are logged and skipped.
+        """
+        if not pairs:
+            return []
+        workers = min(MAX_CONCURRENT_WRITES, len(pairs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.update_test_case, tc_id, tc)
+                for tc_id, tc in pairs
+            ]
+            updated: list[tuple[int, GeneratedTestCase]] = []
+            for (tc_id, tc), future in zip(pairs, futures):
+                try:
+                    future.result()
+                    updated.append((tc_id, tc))
+                except Exception as exc:
+                    logger.error(
+                        "Failed to update Test Case #%s: %s", tc_id, exc
+                    )
+        if len(updated) < len(pairs):
+            logger.warning(
+                "Updated %d of %d test cases.", len(updated), len(pairs)
+            )
+        return updated
+
     # ── Test Plan / Suite (folder) management ───────────────────────────
 
     def _get_root_suite_id(self) -> int:
-        """Return the root suite ID for the configured Test Plan."""
-        url = (
-            f"{self._base}/_apis/testplan/Plans/{self._plan_id}"
-            f"?{self._api}"
-        )
-        resp = self._session.get(url)
-        resp.raise_for_status()
-        return resp.json()["rootSuite"]["id"]
+        """Return the root suite ID for the configured Test Plan (memoized)."""
+        if self._root_suite_id is None:
+            url = (
+                f"{self._base}/_apis/testplan/Plans/{self._plan_id}"
+                f"?{self._api}"
+            )
+            resp = self._session.get(url)
+            resp.raise_for_status()
+            self._root_suite_id = resp.json()["rootSuite"]["id"]
+        return self._root_suite_id
 
     def _list_child_suites(self, parent_suite_id: int) -> dict[str, int]:
-        """Return {name: id} of all immediate child suites."""
-        url = (
-            f"{self._base}/_apis/testplan/Plans/{self._plan_id}"
-            f"/Suites?{self._api}"
-        )
-        resp = self._session.get(url)
-        resp.raise_for_status()
-        all_suites = resp.json().get("value", []) or []
-        return {
-            s["name"]: s["id"]
-            for s in all_suites
-            if s.get("parentSuite", {}).get("id") == parent_suite_id
-        }
+        """Return {name: id} of all immediate child suites.
+
+        The plan's full suite list is downloaded once and indexed by
+        parent id, so sibling lookups anywhere in the tree are O(1)
+        dict reads instead of repeat full-plan fetches.
+        """
+        if self._suite_index is None:
+            url = (
+                f"{self._base}/_apis/testplan/Plans/{self._plan_id}"
+                f"/Suites?{self._api}"
+            )
+            resp = self._session.get(url)
+            resp.raise_for_status()
+            all_suites = resp.json().get("value", []) or []
+            index: dict[int, dict[str, int]] = defaultdict(dict)
+            for s in all_suites:
+                parent_id = s.get("parentSuite", {}).get("id", 0)
+                index[parent_id][s["name"]] = s["id"]
+            self._suite_index = index
+        return self._suite_index.get(parent_suite_id, {})
 
     def _create_static_suite(
         self, parent_suite_id: int, name: str
@@ -310,11 +499,34 @@ class ADOClient:
         resp = self._session.post(url, json=body, headers=self._json_header)
         resp.raise_for_status()
         suite_id = resp.json()["id"]
+        if self._suite_index is not None:
+            self._suite_index[parent_suite_id][name] = suite_id
         logger.info("Created suite '%s' (id=%s)", name, suite_id)
         return suite_id
 
+    def invalidate_folder_cache(self) -> None:
+        """Drop memoized suite lookups so the next call re-fetches."""
+        self._root_suite_id = None
+        self._folder_map_cache = None
+        self._folder_map_fetched_at = 0.0
+        self._suite_index = None
+
+    def refresh(self) -> None:
+        """Discard all cached ADO state for callers that need freshness."""
+        self.invalidate_folder_cache()
+
     def ensure_folders(self) -> dict[str, int]:
-        """Guarantee the four required folders exist; return {name: id}."""
+        """Guarantee the four required folders exist; return {name: id}.
+
+        The result is cached for FOLDER_CACHE_TTL seconds — the folder
+        layout does not change mid-run, so repeat calls cost no HTTP.
+        """
+        if (
+            self._folder_map_cache is not None
+            and time.monotonic() - self._folder_map_fetched_at < FOLDER_CACHE_TTL
+        ):
+            return self._folder_map_cache
+
         root_id = self._get_root_suite_id()
         existing = self._list_child_suites(root_id)
         folder_map: dict[str, int] = {}
@@ -326,15 +538,31 @@ class ADOClient:
             else:
                 folder_map[folder] = self._create_static_suite(root_id, folder)
 
+        self._folder_map_cache = folder_map
+        self._folder_map_fetched_at = time.monotonic()
         return folder_map
 
-    def add_test_to_suite(self, suite_id: int, test_case_id: int) -> None:
-        """Add a Test Case to a Test Suite (folder)."""
+    def add_tests_to_suite(
+        self, suite_id: int, test_case_ids: list[int]
+    ) -> None:
+        """Add many Test Cases to a Test Suite (folder) in one POST.
+
+        The Suites/{id}/TestCase endpoint accepts an array body, so N
+        test cases cost one round trip per suite instead of N.
+        """
+        if not test_case_ids:
+            return
         url = (
             f"{self._base}/_apis/testplan/Plans/{self._plan_id}"
             f"/Suites/{suite_id}/TestCase?{self._api}"
         )
-        body = [{"workItem": {"id": test_case_id}}]
+        body = [{"workItem": {"id": tid}} for tid in test_case_ids]
         resp = self._session.post(url, json=body, headers=self._json_header)
         resp.raise_for_status()
-        logger.debug("Added TC #%s to suite %s", test_case_id, suite_id)
+        logger.debug(
+            "Added %d TCs to suite %s", len(test_case_ids), suite_id
+        )
+
+    def add_test_to_suite(self, suite_id: int, test_case_id: int) -> None:
+        """Add a single Test Case to a Test Suite (folder)."""
+        self.add_tests_to_suite(suite_id, [test_case_id])
@@ -13,6 +13,11 @@ from __future__ import annotations
 import difflib
 import logging
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # pure-Python fallback below
+    fuzz = process = None
+
 from config import Settings
 from models import ExistingTestCase, GeneratedTestCase
 
@@ -70,8 +75,11 @@ class DedupEngine:
         threshold: float | None = None,
     ) -> None:
         self._threshold = threshold or Settings.DEDUP_THRESHOLD
-        self._existing_sigs: list[tuple[int, str]] = [
-            (tc.id, _existing_signature(tc)) for tc in existing
+        # Parallel lists: signatures feed process.cdist directly, ids
+        # map a row's argmax back to the matching work item.
+        self._existing_ids: list[int] = [tc.id for tc in existing]
+        self._existing_sigs: list[str] = [
+            _existing_signature(tc) for tc in existing
         ]
         logger.info(
             "Dedup engine loaded with %d existing TCs (threshold=%.0f%%)",
@@ -81,32 +89,67 @@ class DedupEngine:
 
     def check(self, tc: GeneratedTestCase) -> DedupResult:
         """Return whether *tc* is a semantic duplicate of an existing TC."""
-        new_sig = _tc_signature(tc.title, tc.given, tc.when, tc.then)
-
-        best_score = 0.0
-        best_id = 0
-
-        for existing_id, existing_sig in self._existing_sigs:
-            score = _similarity(new_sig, existing_sig)
-            if score > best_score:
-                best_score = score
-                best_id = existing_id
-
-        if best_score >= self._threshold:
-            logger.info(
-                "Duplicate detected: '%s' ↔ existing #%s (%.1f%%)",
-                tc.title,
-                best_id,
-                best_score * 100,
-            )
-            return DedupResult(
-                is_duplicate=True, matched_id=best_id, score=best_score
-            )
-
-        return DedupResult(is_duplicate=False, matched_id=0, score=best_score)
+        return self.check_batch([tc])[0][1]
 
     def check_batch(
         self, cases: list[GeneratedTestCase]
     ) -> list[tuple[GeneratedTestCase, DedupResult]]:
-        """Check a list of generated TCs; return paired results."""
-        return [(tc, self.check(tc)) for tc in cases]
+        """Check a list of generated TCs; return paired results.
+
+        All pairwise scores are computed in one vectorized
+        ``rapidfuzz.process.cdist`` call (C++), falling back to the
+        original SequenceMatcher loop if RapidFuzz is unavailable.
+        """
+        if not cases or not self._existing_sigs:
+            return [(tc, DedupResult()) for tc in cases]
+
+        new_sigs = [
+            _tc_signature(tc.title, tc.given, tc.when, tc.then) for tc in cases
+        ]
+        existing_sigs = self._existing_sigs
+
+        if process is not None:
+            scores = process.cdist(
+                new_sigs,
+                existing_sigs,
+                scorer=fuzz.token_set_ratio,
+                workers=-1,
+            )
+            best = [
+                (int(row.argmax()), float(row.max()) / 100.0) for row in scores
+            ]
+        else:
+            best = []
+            for new_sig in new_sigs:
+                new_len = len(new_sig)
+                best_idx, best_score = 0, 0.0
+                for idx, sig in enumerate(existing_sigs):
+                    # Cheap prune: SequenceMatcher.ratio is bounded above
+                    # by 2·min(len)/(len_a+len_b), so skip pairs whose
+                    # lengths alone cannot beat the current best.
+                    total = new_len + len(sig)
+                    if total and 2.0 * min(new_len, len(sig)) / total <= best_score:
+                        continue
+                    score = _similarity(new_sig, sig)
+                    if score > best_score:
+                        best_idx, best_score = idx, score
+                best.append((best_idx, best_score))
+
+        results: list[tuple[GeneratedTestCase, DedupResult]] = []
+        for tc, (best_idx, best_score) in zip(cases, best):
+            best_id = self._existing_ids[best_idx]
+            if best_score >= self._threshold:
+                logger.info(
+                    "Duplicate detected: '%s' ↔ existing #%s (%.1f%%)",
+                    tc.title,
+                    best_id,
+                    best_score * 100,
+                )
+                results.append(
+                    (tc, DedupResult(is_duplicate=True, matched_id=best_id, score=best_score))
+                )
+            else:
+                results.append(
+                    (tc, DedupResult(is_duplicate=False, matched_id=0, score=best_score))
+                )
+        return results
@@ -8,22 +8,31 @@ should only generate tests for the *new / modified* requirements.
 
 from __future__ import annotations
 
-import difflib
 import logging
+import math
+import re
+from typing import Final
 
 from models import ExistingTestCase, UserStory
 
 logger = logging.getLogger("test-sync-pro")
 
+# Word-shingle width used when matching AC lines against coverage text.
+_SHINGLE_SIZE: Final = 5
+
+# Leading bullet / numbering noise on Acceptance Criteria lines.
+_LEAD_RE: Final = re.compile(r"^[\s\-•*0-9.)]+")
+
 
 def _extract_criteria_lines(ac_text: str) -> list[str]:
     """Split Acceptance Criteria into discrete, non-empty lines."""
-    lines: list[str] = []
-    for raw in ac_text.replace("\r\n", "\n").split("\n"):
-        clean = raw.strip().lstrip("-•*0123456789.) ")
-        if clean:
-            lines.append(clean)
-    return lines
+    return [
+        clean
+        for clean in (
+            _LEAD_RE.sub("", raw).rstrip() for raw in ac_text.splitlines()
+        )
+        if clean
+    ]
 
 
 def _existing_coverage_text(existing: list[ExistingTestCase]) -> str:
@@ -37,15 +46,45 @@ def _existing_coverage_text(existing: list[ExistingTestCase]) -> str:
     return "\n".join(parts).lower()
 
 
-def _line_is_covered(line: str, coverage_text: str, threshold: float = 0.70) -> bool:
-    """Heuristic: is *line* already represented in the coverage text?"""
-    if line.lower() in coverage_text:
-        return True
-    best = difflib.SequenceMatcher(
-        None, line.lower(), coverage_text
-    ).find_longest_match(0, len(line.lower()), 0, len(coverage_text))
-    ratio = (best.size * 2) / (len(line) + len(coverage_text)) if coverage_text else 0
-    return ratio >= threshold
+def _word_ngrams(words: list[str], n: int) -> set[tuple[str, ...]]:
+    """All contiguous *n*-word shingles of *words*."""
+    return {tuple(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+
+def _covered_flags(
+    ac_lines: list[str], coverage_text: str, threshold: float = 0.70
+) -> list[bool]:
+    """Heuristic coverage check for each AC line.
+
+    The coverage text is shingled into word n-grams once; a line counts
+    as covered when it appears verbatim or when at least *threshold* of
+    its own shingles occur in the coverage shingle set.  Each lookup is
+    O(1), so the whole pass is linear in the coverage text instead of
+    the old per-line SequenceMatcher scan.
+    """
+    coverage_words = coverage_text.split()
+    coverage_vocab = set(coverage_words)
+    ngram_cache: dict[int, set[tuple[str, ...]]] = {}
+
+    flags: list[bool] = []
+    for line in ac_lines:
+        lowered = line.lower()
+        words = lowered.split()
+        # Vocabulary prefilter: a line sharing no word at all with the
+        # coverage text cannot be covered — decide without any scan.
+        if not any(w in coverage_vocab for w in words):
+            flags.append(False)
+            continue
+        if lowered in coverage_text:
+            flags.append(True)
+            continue
+        n = min(_SHINGLE_SIZE, len(words))
+        if n not in ngram_cache:
+            ngram_cache[n] = _word_ngrams(coverage_words, n)
+        shingles = _word_ngrams(words, n)
+        hits = sum(1 for s in shingles if s in ngram_cache[n])
+        flags.append(hits >= math.ceil(threshold * len(shingles)))
+    return flags
 
 
 # ── Public API ──────────────────────────────────────────────────────────
@@ -81,8 +120,8 @@ class DeltaAnalyzer:
         coverage = _existing_coverage_text(self._existing)
         uncovered: list[str] = []
 
-        for line in ac_lines:
-            if not _line_is_covered(line, coverage):
+        for line, covered in zip(ac_lines, _covered_flags(ac_lines, coverage)):
+            if not covered:
                 uncovered.append(line)
                 logger.debug("Uncovered AC line: %s", line)
             else:
@@ -11,12 +11,16 @@ Folder hierarchy under the Test Plan:
 from __future__ import annotations
 
 import logging
+from typing import Final
 
 from ado_client import ADOClient
 from models import GeneratedTestCase
 
 logger = logging.getLogger("test-sync-pro")
 
+# Categories with a dedicated suite; anything else files under Regression.
+_VALID_CATEGORIES: Final = frozenset(("Smoke", "Sanity", "Regression"))
+
 
 class FolderManager:
     """Ensures the folder hierarchy exists and files tests into the right suites."""
@@ -50,7 +54,7 @@ class FolderManager:
                 "TC #%s → Complete Test Cases (suite %s)", test_case_id, complete_id
             )
 
-        category = tc.category if tc.category in ("Smoke", "Sanity", "Regression") else "Regression"
+        category = tc.category if tc.category in _VALID_CATEGORIES else "Regression"
         cat_suite_id = self._folder_map.get(category)
         if cat_suite_id:
             self._ado.add_test_to_suite(cat_suite_id, test_case_id)
@@ -62,9 +66,28 @@ class FolderManager:
         self,
         id_tc_pairs: list[tuple[int, GeneratedTestCase]],
     ) -> None:
-        """Convenience: assign a batch of test cases to folders."""
+        """Convenience: assign a batch of test cases to folders.
+
+        Test cases are bucketed per suite first, then each suite gets a
+        single array-body POST — one round trip per folder instead of
+        one per (folder, test case) pair.
+        """
+        if not id_tc_pairs:
+            return
         if not self._folder_map:
             self.setup_folders()
+
+        buckets: dict[str, list[int]] = {
+            name: [] for name in self._folder_map
+        }
         for tc_id, tc in id_tc_pairs:
-            self.assign_test(tc_id, tc)
+            buckets["Complete Test Cases"].append(tc_id)
+            category = (
+                tc.category if tc.category in _VALID_CATEGORIES else "Regression"
+            )
+            buckets[category].append(tc_id)
+
+        for name, ids in buckets.items():
+            if ids:
+                self._ado.add_tests_to_suite(self._folder_map[name], ids)
         logger.info("Assigned %d test cases to folders.", len(id_tc_pairs))
@@ -0,0 +1,110 @@
+"""
+llm_cache.py – Local disk cache for generated test cases.
+
+LLM round-trips dominate a sync's wall time, yet re-running the agent on
+an unchanged story re-sends the identical prompt.  The cache keys a
+SHA-256 digest of the prompt content to the parsed test cases, so exact
+repeats skip the provider call entirely and return in microseconds.
+
+Entries are gzip-compressed JSON files under ``~/.cache/test-sync-pro``
+(or ``$XDG_CACHE_HOME``) — inspectable with ``zcat`` and safe to delete.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+from models import GeneratedTestCase, TestStep
+
+logger = logging.getLogger("test-sync-pro")
+
+_DEFAULT_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "test-sync-pro"
+)
+
+
+class ResponseCache:
+    """Exact-match cache: prompt digest → parsed test cases."""
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self._dir = cache_dir or _DEFAULT_DIR
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def stats(self) -> tuple[int, int]:
+        """(hits, misses) recorded by this process — for tuning visibility."""
+        return self._hits, self._misses
+
+    @staticmethod
+    def key(*parts: str | bytes) -> str:
+        """Stable digest over any number of prompt components.
+
+        Components may be pre-encoded bytes so large constant parts
+        (e.g. the system prompt) are not re-encoded on every call.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.json.gz"
+
+    def get(self, key: str) -> list[GeneratedTestCase] | None:
+        """Return cached cases for *key*, or None on miss / bad entry."""
+        path = self._path(key)
+        try:
+            items = json.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        except (OSError, EOFError, json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning("Dropping unreadable cache entry %s", path.name)
+            path.unlink(missing_ok=True)
+            self._misses += 1
+            return None
+
+        try:
+            cases = [
+                GeneratedTestCase(
+                    **{
+                        **obj,
+                        "steps": [TestStep(**s) for s in obj["steps"]],
+                    }
+                )
+                for obj in items
+            ]
+        except (KeyError, TypeError):
+            logger.warning("Dropping stale cache entry %s", path.name)
+            path.unlink(missing_ok=True)
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        logger.debug(
+            "Response cache hit (hits=%d, misses=%d)", self._hits, self._misses
+        )
+        return cases
+
+    def put(self, key: str, cases: list[GeneratedTestCase]) -> None:
+        """Persist parsed cases for *key* (best-effort)."""
+        try:
+            payload = json.dumps([asdict(tc) for tc in cases]).encode("utf-8")
+            self._path(key).write_bytes(gzip.compress(payload, compresslevel=6))
+        except OSError as exc:
+            logger.debug("Could not write cache entry: %s", exc)
+
+    def clear(self) -> None:
+        """Delete every cached entry (including pre-gzip *.json ones)."""
+        for path in self._dir.glob("*.json*"):
+            path.unlink(missing_ok=True)
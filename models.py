@@ -6,7 +6,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class UserStory:
     """Represents an Azure DevOps User Story work item."""
 
@@ -19,7 +19,7 @@ class UserStory:
     state: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestStep:
     """A single action + expected-result pair inside a test case."""
 
@@ -27,7 +27,7 @@ class TestStep:
     expected_result: str
 
 
-@dataclass
+@dataclass(slots=True)
 class GeneratedTestCase:
     """A BDD test case produced by the AI generator."""
 
@@ -42,7 +42,7 @@ class GeneratedTestCase:
     test_type: str = "Positive"           # Positive | Negative | Edge
 
 
-@dataclass
+@dataclass(slots=True)
 class ExistingTestCase:
     """A test case that already exists in ADO, linked to the story."""
 
@@ -54,7 +54,7 @@ class ExistingTestCase:
     revision: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncResult:
     """Summary returned after the full sync cycle."""
 
@@ -5,6 +5,7 @@ run.py – CLI entry-point for Test-Sync-Pro.
 Usage:
     python run.py --id 12345
     python run.py --id 12345 --dry-run
+    python run.py --ids 101,102,103
 """
 
 from __future__ import annotations
@@ -12,19 +13,24 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
 from rich.console import Console
+from rich.live import Live
 from rich.logging import RichHandler
 from rich.panel import Panel
 from rich.table import Table
 
-from ado_client import ADOClient
 from config import Settings
-from dedup_engine import DedupEngine
-from delta_analyzer import DeltaAnalyzer
-from folder_manager import FolderManager
-from models import GeneratedTestCase, SyncResult
-from test_generator import TestGenerator
+from models import ExistingTestCase, GeneratedTestCase, SyncResult, UserStory
+
+if TYPE_CHECKING:
+    from ado_client import ADOClient
+
+# ado_client (azure-devops + msrest) and test_generator (openai) dominate
+# interpreter startup, so they are imported inside the pipeline functions —
+# `--help` and argument errors return without paying for them.
 
 console = Console()
 
@@ -56,7 +62,7 @@ def _show_story(story) -> None:
     )
 
 
-def _show_plan(cases: list[GeneratedTestCase]) -> None:
+def _plan_table() -> Table:
     table = Table(title="Generated Test Cases", show_lines=True)
     table.add_column("#", style="dim", width=4)
     table.add_column("Title", style="bold")
@@ -64,16 +70,27 @@ def _show_plan(cases: list[GeneratedTestCase]) -> None:
     table.add_column("Pri", width=4, justify="center")
     table.add_column("Category", width=12)
     table.add_column("Tags", width=24)
+    return table
 
-    for i, tc in enumerate(cases, 1):
-        table.add_row(
-            str(i),
-            tc.title,
-            tc.test_type,
-            str(tc.priority),
-            tc.category,
-            ", ".join(tc.tags),
-        )
+
+def _plan_row(index: int, tc: GeneratedTestCase) -> tuple[str, ...]:
+    return (
+        str(index),
+        tc.title,
+        tc.test_type,
+        str(tc.priority),
+        tc.category,
+        ", ".join(tc.tags),
+    )
+
+
+def _show_plan(cases: list[GeneratedTestCase]) -> None:
+    table = _plan_table()
+    # Build every row up front, then feed the table in one tight loop —
+    # rich only measures and renders once, on the final print.
+    rows = [_plan_row(i, tc) for i, tc in enumerate(cases, 1)]
+    for row in rows:
+        table.add_row(*row)
     console.print(table)
 
 
@@ -93,46 +110,16 @@ def _show_results(result: SyncResult) -> None:
 
 # ── Core orchestration ─────────────────────────────────────────────────
 
-def run(story_id: int, dry_run: bool = False) -> SyncResult:
-    """End-to-end pipeline: Fetch → Analyze → Generate → Dedup → Push."""
-    result = SyncResult(story_id=story_id)
-
-    # ── Phase 1: Fetch ──────────────────────────────────────────────
-    console.rule("[bold blue]Phase 1 · Fetch User Story")
-    ado = ADOClient()
-    story = ado.get_user_story(story_id)
-    _show_story(story)
-
-    existing = ado.get_linked_test_cases(story_id)
-    console.print(f"  Found [cyan]{len(existing)}[/] existing linked Test Cases.\n")
-
-    # ── Phase 2: Delta analysis ─────────────────────────────────────
-    console.rule("[bold blue]Phase 2 · Delta Analysis")
-    analyzer = DeltaAnalyzer(story, existing)
-    delta = analyzer.compute_delta()
-
-    if analyzer.has_existing_tests and not delta:
-        console.print(
-            "[green]All Acceptance Criteria already covered.[/]  Nothing to generate."
-        )
-        result.skipped_count = len(existing)
-        return result
-
-    if delta:
-        console.print("[yellow]Uncovered criteria detected:[/]")
-        console.print(delta)
-    else:
-        console.print("[dim]No existing tests — generating full coverage.[/]")
-
-    # ── Phase 3: AI generation ──────────────────────────────────────
-    console.rule("[bold blue]Phase 3 · Generate Test Cases")
-    generator = TestGenerator()
-    cases = generator.generate(story, delta_hint=delta)
-    _show_plan(cases)
-
-    if dry_run:
-        console.print("\n[yellow bold]DRY RUN[/] – no changes written to ADO.")
-        return result
+def _dedup_and_push(
+    ado: ADOClient,
+    story_id: int,
+    existing: list[ExistingTestCase],
+    cases: list[GeneratedTestCase],
+    result: SyncResult,
+) -> None:
+    """Phases 4–5 for one story: de-duplicate, then write to ADO."""
+    from dedup_engine import DedupEngine
+    from folder_manager import FolderManager
 
     # ── Phase 4: De-duplication ─────────────────────────────────────
     console.rule("[bold blue]Phase 4 · De-duplication")
@@ -167,25 +154,158 @@ def run(story_id: int, dry_run: bool = False) -> SyncResult:
 
     id_tc_pairs: list[tuple[int, GeneratedTestCase]] = []
 
-    # 5b – create new test cases
-    for tc in to_create:
-        new_id = ado.create_test_case(tc, story_id)
-        result.created_ids.append(new_id)
-        id_tc_pairs.append((new_id, tc))
+    # 5b – create new test cases (concurrent fan-out)
+    created_pairs = ado.create_test_cases(to_create, story_id)
+    result.created_ids.extend(new_id for _, new_id in created_pairs)
+    id_tc_pairs.extend((new_id, tc) for tc, new_id in created_pairs)
+
+    # 5c – update existing test cases (concurrent fan-out)
+    updated_pairs = ado.update_test_cases(to_update)
+    result.updated_ids.extend(tc_id for tc_id, _ in updated_pairs)
+    id_tc_pairs.extend(updated_pairs)
+
+    # 5d – file into suites in the background: suite membership doesn't
+    # affect the summary, so render it immediately and join afterwards.
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        assign_future = pool.submit(folder_mgr.assign_many, id_tc_pairs)
+        _show_results(result)
+        with console.status("[dim]Filing test cases into suites…[/]"):
+            assign_future.result()
+    finally:
+        pool.shutdown(wait=False)
+
+
+def run(story_id: int, dry_run: bool = False) -> SyncResult:
+    """End-to-end pipeline: Fetch → Analyze → Generate → Dedup → Push."""
+    from ado_client import ADOClient
+    from delta_analyzer import DeltaAnalyzer
+    from test_generator import TestGenerator
+
+    result = SyncResult(story_id=story_id)
+
+    # ── Phase 1: Fetch ──────────────────────────────────────────────
+    console.rule("[bold blue]Phase 1 · Fetch User Story")
+    ado = ADOClient()
+
+    # The ADO fetch and the LLM-client construction (TLS setup, config
+    # resolution) are independent, so let them overlap; each future is
+    # only awaited where its value is first needed.
+    pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        f_fetch = pool.submit(ado.get_story_and_tests, story_id)
+        f_generator = pool.submit(TestGenerator)
 
-    # 5c – update existing test cases
-    for tc_id, tc in to_update:
-        ado.update_test_case(tc_id, tc)
-        result.updated_ids.append(tc_id)
-        id_tc_pairs.append((tc_id, tc))
+        story, existing = f_fetch.result()
+        _show_story(story)
+        console.print(
+            f"  Found [cyan]{len(existing)}[/] existing linked Test Cases.\n"
+        )
 
-    # 5d – file into suites
-    folder_mgr.assign_many(id_tc_pairs)
+        # ── Phase 2: Delta analysis ─────────────────────────────────
+        console.rule("[bold blue]Phase 2 · Delta Analysis")
+        analyzer = DeltaAnalyzer(story, existing)
+        delta = analyzer.compute_delta()
 
-    _show_results(result)
+        if analyzer.has_existing_tests and not delta:
+            console.print(
+                "[green]All Acceptance Criteria already covered.[/]  Nothing to generate."
+            )
+            result.skipped_count = len(existing)
+            return result
+
+        if delta:
+            console.print("[yellow]Uncovered criteria detected:[/]")
+            console.print(delta)
+        else:
+            console.print("[dim]No existing tests — generating full coverage.[/]")
+
+        # ── Phase 3: AI generation ──────────────────────────────────
+        console.rule("[bold blue]Phase 3 · Generate Test Cases")
+        generator = f_generator.result()
+    finally:
+        pool.shutdown(wait=False)
+
+    # Stream cases into the table as they arrive instead of waiting for
+    # the full response — perceived latency drops to time-to-first-case.
+    cases: list[GeneratedTestCase] = []
+    table = _plan_table()
+    with Live(table, console=console, refresh_per_second=8):
+        for tc in generator.generate_stream(story, delta_hint=delta):
+            cases.append(tc)
+            table.add_row(*_plan_row(len(cases), tc))
+
+    if dry_run:
+        console.print("\n[yellow bold]DRY RUN[/] – no changes written to ADO.")
+        return result
+
+    _dedup_and_push(ado, story_id, existing, cases, result)
     return result
 
 
+def run_batch(story_ids: list[int], dry_run: bool = False) -> list[SyncResult]:
+    """Pipeline over several stories, sharing one batched LLM pass.
+
+    Phases 1–2 run per story; stories that still need generation are
+    packed into TestGenerator.generate_batch, then Phases 4–5 dispatch
+    per story as in the single-id flow.
+    """
+    from ado_client import ADOClient
+    from delta_analyzer import DeltaAnalyzer
+    from test_generator import TestGenerator
+
+    ado = ADOClient()
+    results: list[SyncResult] = []
+    pending: list[tuple[SyncResult, UserStory, list[ExistingTestCase]]] = []
+    delta_hints: dict[int, str] = {}
+
+    # ── Phases 1–2 per story ────────────────────────────────────────
+    for story_id in story_ids:
+        console.rule(f"[bold blue]Story #{story_id} · Fetch & Delta")
+        result = SyncResult(story_id=story_id)
+        results.append(result)
+
+        story, existing = ado.get_story_and_tests(story_id)
+        _show_story(story)
+        console.print(
+            f"  Found [cyan]{len(existing)}[/] existing linked Test Cases.\n"
+        )
+
+        analyzer = DeltaAnalyzer(story, existing)
+        delta = analyzer.compute_delta()
+        if analyzer.has_existing_tests and not delta:
+            console.print(
+                "[green]All Acceptance Criteria already covered.[/]  Skipping."
+            )
+            result.skipped_count = len(existing)
+            continue
+
+        delta_hints[story_id] = delta
+        pending.append((result, story, existing))
+
+    if not pending:
+        return results
+
+    # ── Phase 3: one batched generation pass ────────────────────────
+    console.rule("[bold blue]Phase 3 · Generate Test Cases (batch)")
+    generator = TestGenerator()
+    cases_by_id = generator.generate_batch(
+        [story for _, story, _ in pending], delta_hints
+    )
+
+    # ── Phases 4–5 per story ────────────────────────────────────────
+    for result, story, existing in pending:
+        cases = cases_by_id.get(result.story_id, [])
+        console.rule(f"[bold blue]Story #{result.story_id} · Test Cases")
+        _show_plan(cases)
+        if dry_run:
+            console.print("\n[yellow bold]DRY RUN[/] – no changes written to ADO.")
+            continue
+        _dedup_and_push(ado, result.story_id, existing, cases, result)
+
+    return results
+
+
 # ── CLI ─────────────────────────────────────────────────────────────────
 
 def main() -> None:
@@ -196,9 +316,13 @@ def main() -> None:
     parser.add_argument(
         "--id",
         type=int,
-        required=True,
         help="Azure DevOps User Story Work-Item ID.",
     )
+    parser.add_argument(
+        "--ids",
+        type=str,
+        help="Comma-separated Story IDs for batch mode (e.g. 101,102,103).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -214,6 +338,9 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    if not args.id and not args.ids:
+        parser.error("one of --id or --ids is required")
+
     _configure_logging(args.verbose)
 
     console.print(
@@ -226,7 +353,11 @@ def main() -> None:
     Settings.validate()
 
     try:
-        run(args.id, dry_run=args.dry_run)
+        if args.ids:
+            story_ids = [int(s) for s in args.ids.split(",") if s.strip()]
+            run_batch(story_ids, dry_run=args.dry_run)
+        else:
+            run(args.id, dry_run=args.dry_run)
     except KeyboardInterrupt:
         console.print("\n[red]Aborted by user.[/]")
         sys.exit(130)
@@ -17,11 +17,15 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any
+import re
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
 
-from openai import AzureOpenAI, OpenAI
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 from config import Settings
+from llm_cache import ResponseCache
 from models import GeneratedTestCase, TestStep, UserStory
 
 logger = logging.getLogger("test-sync-pro")
@@ -73,9 +77,50 @@ a given User Story.
 Return ONLY the JSON array.  No explanation, no markdown.
 """
 
+# Pre-built system message — the same dict object on every call, so the
+# request body's shared prefix stays bytewise identical across stories.
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Encoded once for cache-key digests; the prompt itself stays str because
+# the provider SDKs only accept text message content.
+_SYSTEM_PROMPT_BYTES = SYSTEM_PROMPT.encode("utf-8")
+
+# Providers whose chat API honours response_format={"type": "json_object"},
+# which guarantees syntactically valid JSON and drops markdown fences.
+_JSON_MODE_PROVIDERS = frozenset(
+    ("openai", "azure_openai", "groq", "together", "mistral")
+)
+
+# JSON mode requires an object root, so capable providers are asked to
+# wrap the array; both parsers already unwrap {"cases": [...]}.
+_JSON_MODE_NOTE = (
+    '\n\nReturn a single JSON object of the form {"cases": [<test cases>]} '
+    "instead of a bare array."
+)
+
+# Advertise compressed transfer; httpx (under all three SDKs) transparently
+# decompresses, and brotli support comes from the optional brotli package.
+_ACCEPT_ENCODING = {"Accept-Encoding": "gzip, deflate, br"}
+
+# Rough per-prompt character budget for batched generation (~6k tokens),
+# keeping multi-story responses comfortably inside max_tokens.
+_MAX_BATCH_CHARS = 24_000
+
+# Static head of the user message.  Provider-side prefix caches (OpenAI,
+# Anthropic, vLLM/llama.cpp) can only reuse KV state for a bytewise-
+# identical prefix, so everything story-specific goes *after* the
+# sentinel and this block never changes.
+_STATIC_PREFIX = """\
+Generate test cases for the user story below the sentinel line,
+applying every rule from the system prompt.  Respond with the strict
+JSON format only.
+
+===STORY===
+"""
 
-def _build_user_prompt(story: UserStory, delta_hint: str = "") -> str:
-    """Compose the user-role message for the LLM."""
+
+def _variable_suffix(story: UserStory, delta_hint: str = "") -> str:
+    """Story-specific tail of the user message."""
     parts = [
         f"## User Story #{story.id}",
         f"**Title:** {story.title}",
@@ -93,58 +138,206 @@ def _build_user_prompt(story: UserStory, delta_hint: str = "") -> str:
     return "\n\n".join(parts)
 
 
+def _build_user_prompt(story: UserStory, delta_hint: str = "") -> str:
+    """Compose the user-role message: stable prefix, variable story last."""
+    return _STATIC_PREFIX + _variable_suffix(story, delta_hint)
+
+
+def _build_batch_prompt(
+    stories: list[UserStory], delta_hints: dict[int, str]
+) -> str:
+    """Compose one user message covering several stories.
+
+    The model is asked for a JSON object keyed by story id so the
+    response can be split back out per story.
+    """
+    header = (
+        "## Batch\n"
+        "Several user stories follow.  Return a single JSON object "
+        'mapping each story id to its array of test cases, e.g. '
+        '{"1234": [<cases>...], "5678": [<cases>...]}.  Apply every '
+        "rule from the system prompt to each story independently."
+    )
+    sections = [
+        _variable_suffix(story, delta_hints.get(story.id, ""))
+        for story in stories
+    ]
+    return _STATIC_PREFIX + "\n\n".join([header, *sections])
+
+
 # ── Response parsing ────────────────────────────────────────────────────
 
-def _parse_response(raw: str) -> list[GeneratedTestCase]:
-    """Parse the LLM JSON response into GeneratedTestCase objects."""
-    raw = raw.strip()
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[-1]
-    if raw.endswith("```"):
-        raw = raw.rsplit("```", 1)[0]
-    raw = raw.strip()
+class _JsonArrayStream:
+    """Incremental parser for a streamed JSON array of objects.
+
+    Characters are fed in as they arrive; each complete top-level object
+    is decoded and handed back immediately, so consumers can act on the
+    first test case while the model is still generating the rest.
+    Anything before the opening ``[`` (markdown fences, an object-root
+    ``{"cases":`` wrapper) is skipped, and anything after the array's
+    closing ``]`` (a trailing ``"summary"`` key, closing fences) is
+    ignored.
+    """
+
+    def __init__(self) -> None:
+        self._started = False
+        self._capturing = False
+        self._in_string = False
+        self._escape = False
+        self._depth = 0
+        self._array_depth = 0
+        self._closed = False
+        self._obj: list[str] = []
+
+    @property
+    def closed(self) -> bool:
+        """True once the top-level array's closing ``]`` has been seen."""
+        return self._closed
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Consume *chunk*; return any objects completed by it."""
+        done: list[dict[str, Any]] = []
+        for ch in chunk:
+            if self._closed:
+                break
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                    self._array_depth = 1
+                continue
+            if self._capturing:
+                self._obj.append(ch)
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == "{":
+                    self._depth += 1
+                elif ch == "}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        done.append(json.loads("".join(self._obj)))
+                        self._obj = []
+                        self._capturing = False
+            elif ch == "{":
+                self._capturing = True
+                self._depth = 1
+                self._obj = ["{"]
+            elif ch == "[":
+                self._array_depth += 1
+            elif ch == "]":
+                self._array_depth -= 1
+                if self._array_depth == 0:
+                    self._closed = True
+        return done
+
+
+# Matches a whole response wrapped in ```/```json fences.
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.S)
+
+
+def _decode_json(raw: str) -> Any:
+    """Strip optional markdown fences and decode the LLM JSON payload."""
+    m = _FENCE_RE.match(raw)
+    raw = m.group(1) if m else raw.strip()
 
     try:
-        items: list[dict[str, Any]] = json.loads(raw)
+        return json.loads(raw)
     except json.JSONDecodeError as exc:
         logger.error("LLM returned invalid JSON: %s\n---\n%s", exc, raw[:500])
         raise ValueError("LLM response is not valid JSON") from exc
 
-    cases: list[GeneratedTestCase] = []
-    for obj in items:
+
+# Keys every test-case object must carry; everything else has defaults.
+_REQUIRED_KEYS = ("title", "given", "when", "then")
+
+
+def _case_from_obj(obj: dict[str, Any]) -> GeneratedTestCase:
+    """Convert one decoded JSON object into a GeneratedTestCase.
+
+    Schema violations surface as a single descriptive ValueError rather
+    than a bare KeyError from deep inside the field lookups.
+    """
+    missing = [k for k in _REQUIRED_KEYS if k not in obj]
+    if missing:
+        raise ValueError(
+            f"LLM test-case object is missing required keys: "
+            f"{', '.join(missing)}"
+        )
+    try:
         steps = [
             TestStep(action=s["action"], expected_result=s["expected_result"])
             for s in obj.get("steps", [])
         ]
-        cases.append(
-            GeneratedTestCase(
-                title=obj["title"],
-                given=obj["given"],
-                when=obj["when"],
-                then=obj["then"],
-                steps=steps,
-                priority=int(obj.get("priority", 2)),
-                tags=obj.get("tags", ["Regression"]),
-                category=obj.get("category", "Regression"),
-                test_type=obj.get("test_type", "Positive"),
-            )
-        )
-    return cases
+    except (KeyError, TypeError) as exc:
+        raise ValueError(
+            f"LLM test-case '{obj['title']}' has a malformed steps entry"
+        ) from exc
+    try:
+        priority = int(obj["priority"])
+    except (KeyError, TypeError, ValueError):
+        priority = 2
+    return GeneratedTestCase(
+        title=obj["title"],
+        given=obj["given"],
+        when=obj["when"],
+        then=obj["then"],
+        steps=steps,
+        priority=priority,
+        tags=obj.get("tags", ["Regression"]),
+        category=obj.get("category", "Regression"),
+        test_type=obj.get("test_type", "Positive"),
+    )
+
+
+def _parse_response(raw: str) -> list[GeneratedTestCase]:
+    """Parse a single-story LLM response into GeneratedTestCase objects."""
+    items = _decode_json(raw)
+    if isinstance(items, dict):
+        # Tolerate an object root by flattening its list values.
+        items = [obj for value in items.values() if isinstance(value, list)
+                 for obj in value]
+    return [_case_from_obj(obj) for obj in items]
+
+
+def _parse_batch_response(raw: str) -> dict[int, list[GeneratedTestCase]]:
+    """Parse a batched response object keyed by story id."""
+    data = _decode_json(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Batch LLM response is not a JSON object")
+    parsed: dict[int, list[GeneratedTestCase]] = {}
+    for key, objs in data.items():
+        try:
+            story_id = int(key)
+        except ValueError:
+            logger.warning("Ignoring non-numeric batch key '%s'", key)
+            continue
+        parsed[story_id] = [_case_from_obj(obj) for obj in objs or []]
+    return parsed
 
 
 # ── Provider-specific callers ───────────────────────────────────────────
 
 def _call_openai_compatible(
-    client: OpenAI, model: str, user_msg: str
+    client: OpenAI, model: str, user_msg: str, json_mode: bool = False
 ) -> str:
     """Shared call logic for OpenAI and every OpenAI-compatible provider."""
+    extra: dict[str, Any] = (
+        {"response_format": {"type": "json_object"}} if json_mode else {}
+    )
     response = client.chat.completions.create(
         model=model,
         temperature=0.2,
         messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
+            _SYSTEM_MSG,
             {"role": "user", "content": user_msg},
         ],
+        **extra,
     )
     return response.choices[0].message.content or ""
 
@@ -155,27 +348,92 @@ def _call_anthropic(client: Any, model: str, user_msg: str) -> str:
         model=model,
         max_tokens=8192,
         temperature=0.2,
-        system=SYSTEM_PROMPT,
+        # cache_control lets Anthropic reuse the prefilled system block
+        # across calls instead of re-processing it per story.
+        system=[
+            {
+                "type": "text",
+                "text": SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
         messages=[{"role": "user", "content": user_msg}],
     )
     return response.content[0].text
 
 
+def _stream_openai_compatible(
+    client: OpenAI, model: str, user_msg: str, json_mode: bool = False
+) -> Iterator[str]:
+    """Yield response text chunks as the provider generates them."""
+    extra: dict[str, Any] = (
+        {"response_format": {"type": "json_object"}} if json_mode else {}
+    )
+    stream = client.chat.completions.create(
+        model=model,
+        temperature=0.2,
+        stream=True,
+        messages=[
+            _SYSTEM_MSG,
+            {"role": "user", "content": user_msg},
+        ],
+        **extra,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _stream_anthropic(client: Any, model: str, user_msg: str) -> Iterator[str]:
+    """Yield response text chunks from Anthropic's streaming API."""
+    with client.messages.stream(
+        model=model,
+        max_tokens=8192,
+        temperature=0.2,
+        system=[
+            {
+                "type": "text",
+                "text": SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+        messages=[{"role": "user", "content": user_msg}],
+    ) as stream:
+        yield from stream.text_stream
+
+
 # ── Public API ──────────────────────────────────────────────────────────
 
 class TestGenerator:
     """Generates BDD test cases by calling the configured LLM provider."""
 
-    def __init__(self) -> None:
+    def __init__(self, http_client: Any | None = None) -> None:
+        """Set up the provider SDK client.
+
+        *http_client* optionally injects a shared ``httpx.Client`` (all
+        three SDKs accept one), so callers managing several clients can
+        pool connections and reuse keep-alive sockets across them.
+        """
         provider = Settings.LLM_PROVIDER
+        self._cache = ResponseCache()
+        self._json_mode = provider in _JSON_MODE_PROVIDERS
 
         if provider == "azure_openai":
+            # Imported lazily: the openai SDK costs a noticeable chunk of
+            # interpreter startup, so it only loads once a generator is
+            # actually constructed.
+            from openai import AzureOpenAI
+
             self._provider = "openai_compat"
-            self._openai = AzureOpenAI(
-                azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT,
-                api_key=Settings.AZURE_OPENAI_API_KEY,
-                api_version=Settings.AZURE_OPENAI_API_VERSION,
-            )
+            kwargs: dict[str, Any] = {
+                "azure_endpoint": Settings.AZURE_OPENAI_ENDPOINT,
+                "api_key": Settings.AZURE_OPENAI_API_KEY,
+                "api_version": Settings.AZURE_OPENAI_API_VERSION,
+                "default_headers": _ACCEPT_ENCODING,
+            }
+            if http_client is not None:
+                kwargs["http_client"] = http_client
+            self._openai = AzureOpenAI(**kwargs)
             self._model = Settings.AZURE_OPENAI_DEPLOYMENT
             logger.info("LLM provider: Azure OpenAI  (deployment=%s)", self._model)
 
@@ -188,16 +446,29 @@ class TestGenerator:
                     "  → Run: pip install anthropic"
                 )
             self._provider = "anthropic"
-            self._anthropic = anthropic.Anthropic(api_key=Settings.LLM_API_KEY)
+            kwargs = {
+                "api_key": Settings.LLM_API_KEY,
+                "default_headers": _ACCEPT_ENCODING,
+            }
+            if http_client is not None:
+                kwargs["http_client"] = http_client
+            self._anthropic = anthropic.Anthropic(**kwargs)
             self._model = Settings.LLM_MODEL
             logger.info("LLM provider: Anthropic  (model=%s)", self._model)
 
         else:
+            from openai import OpenAI
+
             self._provider = "openai_compat"
             base_url = Settings.resolved_base_url()
-            kwargs: dict[str, Any] = {"api_key": Settings.LLM_API_KEY}
+            kwargs = {
+                "api_key": Settings.LLM_API_KEY,
+                "default_headers": _ACCEPT_ENCODING,
+            }
             if base_url:
                 kwargs["base_url"] = base_url
+            if http_client is not None:
+                kwargs["http_client"] = http_client
             self._openai = OpenAI(**kwargs)
             self._model = Settings.LLM_MODEL
             label = provider if provider != "openai" else "OpenAI"
@@ -213,16 +484,170 @@ class TestGenerator:
         story: UserStory,
         delta_hint: str = "",
     ) -> list[GeneratedTestCase]:
-        """Call the configured LLM and return parsed test cases."""
+        """Call the configured LLM and return parsed test cases.
+
+        Identical prompts are served from the local response cache
+        without touching the provider.
+        """
+        return list(self.generate_stream(story, delta_hint))
+
+    def generate_stream(
+        self,
+        story: UserStory,
+        delta_hint: str = "",
+    ) -> Iterator[GeneratedTestCase]:
+        """Yield test cases incrementally as the LLM streams them.
+
+        Each completed JSON object is parsed and yielded immediately, so
+        the first case appears after roughly one token round-trip rather
+        than after the full response.  Cache hits yield instantly.
+        """
         user_msg = _build_user_prompt(story, delta_hint)
-        logger.info("Sending prompt to LLM (%d chars)…", len(user_msg))
+        if self._json_mode:
+            user_msg += _JSON_MODE_NOTE
+
+        if delta_hint:
+            # Iterative rerun: generation is driven by the delta alone,
+            # so key on the stable inputs — edits to unrelated story
+            # fields (title/description typo fixes) still hit.
+            cache_key = ResponseCache.key(
+                self._model,
+                _SYSTEM_PROMPT_BYTES,
+                str(story.id),
+                story.acceptance_criteria,
+                delta_hint,
+            )
+        else:
+            cache_key = ResponseCache.key(
+                self._model, _SYSTEM_PROMPT_BYTES, user_msg
+            )
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            if delta_hint:
+                logger.info("Delta memoized (%d cases from cache)", len(cached))
+            else:
+                logger.info(
+                    "LLM response served from cache (%d cases)", len(cached)
+                )
+            yield from cached
+            return
 
+        logger.info("Streaming prompt to LLM (%d chars)…", len(user_msg))
         if self._provider == "anthropic":
-            raw = _call_anthropic(self._anthropic, self._model, user_msg)
+            chunks = _stream_anthropic(self._anthropic, self._model, user_msg)
         else:
-            raw = _call_openai_compatible(self._openai, self._model, user_msg)
+            chunks = _stream_openai_compatible(
+                self._openai, self._model, user_msg, json_mode=self._json_mode
+            )
 
-        logger.debug("LLM response length: %d chars", len(raw))
-        cases = _parse_response(raw)
+        parser = _JsonArrayStream()
+        raw_parts: list[str] = []
+        cases: list[GeneratedTestCase] = []
+        for chunk in chunks:
+            raw_parts.append(chunk)
+            for obj in parser.feed(chunk):
+                tc = _case_from_obj(obj)
+                cases.append(tc)
+                yield tc
+
+        if not cases:
+            # Safety net: re-parse the buffered response in one piece in
+            # case the model used a layout the stream parser skipped.
+            cases = _parse_response("".join(raw_parts))
+            yield from cases
+        elif not parser.closed:
+            # The stream ended before the array closed (token cap hit,
+            # connection dropped).  Raise like the buffered path does on
+            # truncated JSON — never cache a silently shortened plan.
+            raise ValueError(
+                f"LLM stream ended mid-response after {len(cases)} test "
+                "case(s); the result is incomplete and was not cached"
+            )
+
+        self._cache.put(cache_key, cases)
         logger.info("Generated %d test cases", len(cases))
-        return cases
+
+    def generate_batch(
+        self,
+        stories: list[UserStory],
+        delta_hints: dict[int, str] | None = None,
+        batch_size: int = 6,
+    ) -> dict[int, list[GeneratedTestCase]]:
+        """Generate cases for several stories with few LLM round trips.
+
+        Stories are packed up to *batch_size* per prompt (also capped by
+        a character budget so responses fit within max_tokens); each LLM
+        call returns a JSON object keyed by story id.  Stories missing
+        from a response fall back to individual generation.
+        """
+        delta_hints = delta_hints or {}
+        results: dict[int, list[GeneratedTestCase]] = {}
+
+        for chunk in self._chunk_stories(stories, delta_hints, batch_size):
+            if len(chunk) == 1:
+                story = chunk[0]
+                results[story.id] = self.generate(
+                    story, delta_hints.get(story.id, "")
+                )
+                continue
+
+            user_msg = _build_batch_prompt(chunk, delta_hints)
+            raw = self._call_llm(user_msg)
+            parsed = _parse_batch_response(raw)
+
+            for story in chunk:
+                if story.id in parsed:
+                    results[story.id] = parsed[story.id]
+                else:
+                    logger.warning(
+                        "Story #%s missing from batch response; retrying solo.",
+                        story.id,
+                    )
+                    results[story.id] = self.generate(
+                        story, delta_hints.get(story.id, "")
+                    )
+            logger.info(
+                "Batch of %d stories → %d test cases",
+                len(chunk),
+                sum(len(results[s.id]) for s in chunk),
+            )
+        return results
+
+    @staticmethod
+    def _chunk_stories(
+        stories: list[UserStory],
+        delta_hints: dict[int, str],
+        batch_size: int,
+    ) -> list[list[UserStory]]:
+        """Split stories into prompt-sized chunks by count and length."""
+        chunks: list[list[UserStory]] = []
+        current: list[UserStory] = []
+        current_chars = 0
+        for story in stories:
+            section_chars = len(
+                _variable_suffix(story, delta_hints.get(story.id, ""))
+            )
+            if current and (
+                len(current) >= batch_size
+                or current_chars + section_chars > _MAX_BATCH_CHARS
+            ):
+                chunks.append(current)
+                current, current_chars = [], 0
+            current.append(story)
+            current_chars += section_chars
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _call_llm(self, user_msg: str) -> str:
+        """Dispatch one prompt to the configured provider."""
+        logger.info("Sending prompt to LLM (%d chars)…", len(user_msg))
+        if self._provider == "anthropic":
+            raw = _call_anthropic(self._anthropic, self._model, user_msg)
+        else:
+            raw = _call_openai_compatible(
+                self._openai, self._model, user_msg, json_mode=self._json_mode
+            )
+        logger.debug("LLM response length: %d chars", len(raw))
+        return raw